@@ -0,0 +1,112 @@
+"""
+Helpers shared by the root-level LangGraph investigation scripts
+(test_langgraph_isolation.py and test_real_issue.py).
+"""
+
+import asyncio
+import sys
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from _lazy import get_langgraph_agent_cls
+
+if TYPE_CHECKING:
+    from backend.agents.langgraph_agent import LangGraphAgent
+
+# Interned so the per-chunk check is usually a pointer comparison
+_DONE = sys.intern("done")
+# Every chunk process_query_streaming yields carries a "type" key
+_get_type = itemgetter("type")
+
+# Upper bound on a single stream, so a model that never sends "done" can't hang the run
+STREAM_TIMEOUT = 30
+
+
+class StreamFailed(Exception):
+    """A stream raised part-way through; carries the chunks received before the error"""
+
+    def __init__(self, chunks: int, error: Exception):
+        super().__init__(str(error))
+        self.chunks = chunks
+        self.error = error
+
+
+async def count_until_done(stream, timeout: float = STREAM_TIMEOUT) -> Tuple[int, bool]:
+    """Count chunks up to and including "done", then close the stream deterministically.
+    Returns the chunk count and whether the stream was cut off after timeout seconds.
+    Raises StreamFailed, carrying the partial count, if the stream itself raises."""
+    count = 0
+    timed_out = False
+    try:
+        async with asyncio.timeout(timeout):
+            while True:
+                chunk = await stream.__anext__()
+                count += 1
+                chunk_type = _get_type(chunk)
+                if chunk_type is _DONE or chunk_type == _DONE:
+                    break
+    except StopAsyncIteration:
+        pass
+    except TimeoutError:
+        timed_out = True
+    except Exception as e:
+        raise StreamFailed(count, e) from e
+    finally:
+        await stream.aclose()
+    return count, timed_out
+
+
+def instrument_langchain(tracer_provider):
+    """Instrument LangChain with tracer_provider, as backend/main.py does at startup.
+    Returns the instrumentor so the caller can uninstrument() when it is done."""
+    from openinference.instrumentation.langchain import LangChainInstrumentor
+
+    instrumentor = LangChainInstrumentor()
+    instrumentor.instrument(tracer_provider=tracer_provider)
+    return instrumentor
+
+
+def get_loop_factory():
+    """uvloop's C event loop iterates the async-generator streams faster; None means asyncio's default"""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def result_or_failure(result: Any, failure: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an exception returned by asyncio.gather onto the test's failure result"""
+    if isinstance(result, BaseException):
+        return {**failure, "error": str(result)}
+    return result
+
+
+def mark(ok: bool) -> str:
+    return "✅" if ok else "❌"
+
+
+def error_line(result: Dict[str, Any]) -> str:
+    """The report's optional "Error:" line, including its leading newline"""
+    return f"\n  Error: {result['error']}" if result['error'] else ""
+
+
+# One agent shared by a script's tests when it is run directly; under pytest the
+# tests take the conftest `agent` fixture instead. Distinct thread IDs keep them isolated.
+_AGENT: Optional["LangGraphAgent"] = None
+
+
+async def get_agent() -> "LangGraphAgent":
+    """Return the script-run LangGraphAgent, importing and creating it on first use"""
+    global _AGENT
+    if _AGENT is None:
+        _AGENT = get_langgraph_agent_cls()()
+    return _AGENT
+
+
+async def cleanup_agent():
+    """Close the shared agent's checkpointer connection, if one was created"""
+    global _AGENT
+    if _AGENT is not None:
+        await _AGENT.cleanup()
+        _AGENT = None
@@ -0,0 +1,22 @@
+"""
+Lazy accessors for the heavy imports shared by the root-level test scripts.
+Importing the agent pulls in the whole LangGraph + LLM stack, so scripts that
+never build an agent should not pay for it at startup.
+"""
+
+import sys
+
+_AGENT_MODULE = "backend.agents.langgraph_agent"
+
+_LGA = None
+
+
+def get_langgraph_agent_cls():
+    """Return LangGraphAgent, importing backend.agents.langgraph_agent on first call"""
+    global _LGA
+    if _LGA is None:
+        module = sys.modules.get(_AGENT_MODULE)
+        if module is None:
+            module = __import__(_AGENT_MODULE, fromlist=["LangGraphAgent"])
+        _LGA = module.LangGraphAgent
+    return _LGA
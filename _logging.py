@@ -0,0 +1,33 @@
+"""
+Logging setups shared by the root-level test scripts. Each is meant to be
+called from a script's __main__ block, so importing a script (pytest,
+run_all.py) never reconfigures root logging.
+"""
+
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+
+
+def setup_queue_logging(level: int = logging.INFO) -> QueueListener:
+    """Route root logging through a queue, starting the process-wide listener once.
+    Records are written by a background thread, so the scrapers and the agent never
+    block on the terminal."""
+    global _listener
+    if _listener is None:
+        log_queue = queue.Queue(-1)
+        _listener = QueueListener(log_queue, logging.StreamHandler())
+        _listener.start()
+        atexit.register(_listener.stop)
+        logging.basicConfig(level=level, handlers=[QueueHandler(log_queue)])
+    return _listener
+
+
+def setup_stdout_logging(level: int = logging.INFO):
+    """Log plain messages to a block-buffered stdout instead of flushing per line"""
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    logging.basicConfig(level=level, stream=sys.stdout, format="%(message)s")
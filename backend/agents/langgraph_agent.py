@@ -2,12 +2,14 @@ from typing import List, Dict, Any, Optional, TypedDict, Annotated, AsyncGenerat
 import uuid
 import logging
 import asyncio
+from collections import OrderedDict
 from contextlib import asynccontextmanager, suppress
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import BaseTool
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langchain.chat_models import init_chat_model
 from langchain_google_genai import ChatGoogleGenerativeAI
 
@@ -21,6 +23,7 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 DATABASE_URL = settings.DATABASE_URL
+HISTORY_CACHE_SIZE = 128  # Number of threads whose formatted chat history is kept in memory
 
 # Define the LangGraph state with additional fields for our workflow
 class LangGraphState(TypedDict):
@@ -38,12 +41,22 @@ class LangGraphState(TypedDict):
 class LangGraphAgent:
     """LangGraph-based agent with three-step RAG workflow and proper checkpointer management"""
 
-    def __init__(self):
+    def __init__(self, checkpointer_url: Optional[str] = None):
+        # Postgres URL in production; a SQLite path or ":memory:" for local testing
+        self.checkpointer_url = checkpointer_url or DATABASE_URL
         self.checkpointer_cm = None  # Store the context manager
         self.checkpointer = None     # Store the actual checkpointer instance
         self.graph = None
         self._initialization_lock = asyncio.Lock()
         self._is_initialized = False
+        # thread_id -> formatted chat history, invalidated whenever the thread is written
+        self._history_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        # thread_id -> monotonic write counter; a history read is only cached if
+        # no write to its thread finished while the read was in flight. Entries
+        # only live while a read of the thread is in flight (see _history_reads).
+        self._history_versions: Dict[str, int] = {}
+        # thread_id -> number of uncached history reads in flight
+        self._history_reads: Dict[str, int] = {}
 
     async def initialize(self):
         """Initialize the agent with persistent checkpointer"""
@@ -53,10 +66,18 @@ class LangGraphAgent:
             
             try:
                 # Create the async context manager for the checkpointer
-                self.checkpointer_cm = AsyncPostgresSaver.from_conn_string(DATABASE_URL)
+                if self.checkpointer_url.startswith("postgres"):
+                    self.checkpointer_cm = AsyncPostgresSaver.from_conn_string(self.checkpointer_url)
+                else:
+                    self.checkpointer_cm = AsyncSqliteSaver.from_conn_string(self.checkpointer_url)
                 
                 # Enter the context manager
                 self.checkpointer = await self.checkpointer_cm.__aenter__()
+
+                if isinstance(self.checkpointer, AsyncSqliteSaver):
+                    # WAL lets history reads proceed while a checkpoint is being written
+                    await self.checkpointer.conn.execute("PRAGMA journal_mode=WAL")
+                    await self.checkpointer.conn.execute("PRAGMA synchronous=NORMAL")
                 
                 # Build and compile the graph with checkpointer
                 builder = self._build_graph_builder()
@@ -98,6 +119,28 @@ class LangGraphAgent:
         
         return builder
 
+    def _invalidate_chat_history(self, thread_id: Optional[str]):
+        """Drop the cached chat history for a thread after its state changes"""
+        if thread_id:
+            # Only an in-flight read needs to see the write; otherwise there is nothing to version
+            if thread_id in self._history_reads:
+                self._history_versions[thread_id] = self._history_versions.get(thread_id, 0) + 1
+            self._history_cache.pop(thread_id, None)
+
+    def _begin_history_read(self, thread_id: str) -> int:
+        """Register an uncached history read and return the thread's current version"""
+        self._history_reads[thread_id] = self._history_reads.get(thread_id, 0) + 1
+        return self._history_versions.setdefault(thread_id, 0)
+
+    def _end_history_read(self, thread_id: str):
+        """Unregister a history read, dropping the thread's bookkeeping once none are left"""
+        remaining = self._history_reads[thread_id] - 1
+        if remaining:
+            self._history_reads[thread_id] = remaining
+        else:
+            del self._history_reads[thread_id]
+            del self._history_versions[thread_id]
+
     async def _ensure_initialized(self):
         """Ensure the agent is initialized before use"""
         if not self._is_initialized:
@@ -329,6 +372,8 @@ class LangGraphAgent:
                 "response": f"Error processing your request: {str(e)}",
                 "thread_id": thread_id or "unknown"
             }
+        finally:
+            self._invalidate_chat_history(thread_id)
 
     async def process_query_streaming(
         self,
@@ -473,6 +518,8 @@ class LangGraphAgent:
                 logger.debug("Client disconnected during error handling")
                 return
         finally:
+            self._invalidate_chat_history(thread_id)
+
             # Ensure any cleanup is done
             if stream_started:
                 logger.debug(f"Stream completed for thread {thread_id}")
@@ -494,6 +541,7 @@ class LangGraphAgent:
 
                         # Explicitly update the state to ensure persistence
                         await self.graph.aupdate_state(config, state_values)
+                        self._invalidate_chat_history(thread_id)
                         logger.info(f"Successfully persisted final state for thread {thread_id}")
                     else:
                         logger.warning(f"No state found to persist for thread {thread_id}")
@@ -517,44 +565,84 @@ class LangGraphAgent:
     async def get_chat_history(self, thread_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get chat history for a specific thread"""
         try:
+            cached = self._history_cache.get(thread_id)
+            if cached is not None:
+                self._history_cache.move_to_end(thread_id)
+                return list(cached)
+
+            version = self._begin_history_read(thread_id)
+            try:
+                await self._ensure_initialized()
+
+                config = {"configurable": {"thread_id": thread_id}}
+
+                # Get the latest state for this thread
+                latest_state = None
+                async for checkpoint_tuple in self.checkpointer.alist(config, limit=1):
+                    latest_state = checkpoint_tuple
+                    break
+
+                if not latest_state:
+                    return []
+
+                # Extract messages from the latest checkpoint
+                # CheckpointTuple has attributes: checkpoint, metadata, config, parent_config
+                checkpoint_data = latest_state.checkpoint
+                channel_values = checkpoint_data.get("channel_values", {})
+                messages = channel_values.get("messages", [])
+
+                # Format messages for response
+                formatted_messages = []
+                for msg in messages:
+                    if isinstance(msg, (HumanMessage, AIMessage)):
+                        formatted_messages.append({
+                            "type": "human" if isinstance(msg, HumanMessage) else "ai",
+                            "content": msg.content,
+                            "timestamp": None  # LangGraph doesn't store timestamps in the same way
+                        })
+
+                # A write that finished during the read may have made this snapshot stale
+                if self._history_versions[thread_id] == version:
+                    self._history_cache[thread_id] = formatted_messages
+                    if len(self._history_cache) > HISTORY_CACHE_SIZE:
+                        self._history_cache.popitem(last=False)
+
+                return list(formatted_messages)
+            finally:
+                self._end_history_read(thread_id)
+
+        except Exception as e:
+            logger.error(f"Error getting chat history: {e}")
+            return []
+
+    async def get_chat_history_length(self, thread_id: str) -> int:
+        """Count the chat messages in a thread without formatting them"""
+        try:
+            cached = self._history_cache.get(thread_id)
+            if cached is not None:
+                self._history_cache.move_to_end(thread_id)
+                return len(cached)
+
             await self._ensure_initialized()
 
             config = {"configurable": {"thread_id": thread_id}}
 
-            # Get the latest state for this thread
-            latest_state = None
+            # Only the latest checkpoint holds the full message list
             async for checkpoint_tuple in self.checkpointer.alist(config, limit=1):
-                latest_state = checkpoint_tuple
-                break
-
-            if not latest_state:
-                return []
-
-            # Extract messages from the latest checkpoint
-            # CheckpointTuple has attributes: checkpoint, metadata, config, parent_config
-            checkpoint_data = latest_state.checkpoint
-            channel_values = checkpoint_data.get("channel_values", {})
-            messages = channel_values.get("messages", [])
-
-            # Format messages for response
-            formatted_messages = []
-            for msg in messages:
-                if isinstance(msg, (HumanMessage, AIMessage)):
-                    formatted_messages.append({
-                        "type": "human" if isinstance(msg, HumanMessage) else "ai",
-                        "content": msg.content,
-                        "timestamp": None  # LangGraph doesn't store timestamps in the same way
-                    })
-
-            return formatted_messages
+                channel_values = checkpoint_tuple.checkpoint.get("channel_values", {})
+                messages = channel_values.get("messages", [])
+                return sum(1 for msg in messages if isinstance(msg, (HumanMessage, AIMessage)))
+
+            return 0
 
         except Exception as e:
-            logger.error(f"Error getting chat history: {e}")
-            return []
+            logger.error(f"Error getting chat history length: {e}")
+            return 0
 
     async def cleanup(self):
         """Clean up resources"""
         await self._cleanup_checkpointer()
+        self._history_cache.clear()
         self._is_initialized = False
 
 
@@ -0,0 +1,68 @@
+"""knowledge item content hash added
+
+Revision ID: 5c1e9b7d2a4f
+Revises: eaa253747160
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+import hashlib
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9b7d2a4f'
+down_revision: Union[str, Sequence[str], None] = 'eaa253747160'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows read and hashed per round trip during the backfill
+BACKFILL_BATCH_SIZE = 500
+
+
+def _content_hash(content):
+    # Frozen copy of backend.crud.compute_content_hash; migrations must not import app code
+    normalized = unicodedata.normalize("NFC", content or "").strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('knowledge_items', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # Backfill existing rows so dedupe lookups also match items created before this revision
+    knowledge_items = sa.table(
+        'knowledge_items',
+        sa.column('id'),
+        sa.column('content', sa.Text),
+        sa.column('content_hash', sa.String(length=64)),
+    )
+    bind = op.get_bind()
+    update = (
+        knowledge_items.update()
+        .where(knowledge_items.c.id == sa.bindparam('row_id'))
+        .values(content_hash=sa.bindparam('hash'))
+    )
+    # Keyset pagination on id: content is often full scraped PDF text, so only
+    # one batch of rows is held in memory at a time
+    last_id = None
+    while True:
+        query = sa.select(knowledge_items.c.id, knowledge_items.c.content).order_by(knowledge_items.c.id)
+        if last_id is not None:
+            query = query.where(knowledge_items.c.id > last_id)
+        batch = bind.execute(query.limit(BACKFILL_BATCH_SIZE)).fetchall()
+        if not batch:
+            break
+        bind.execute(update, [{'row_id': row.id, 'hash': _content_hash(row.content)} for row in batch])
+        last_id = batch[-1].id
+
+    op.create_index('ix_ki_hash', 'knowledge_items', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ki_hash', table_name='knowledge_items')
+    op.drop_column('knowledge_items', 'content_hash')
@@ -1,3 +1,5 @@
+import hashlib
+import unicodedata
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
@@ -138,8 +140,35 @@ def get_projects(db: Session, skip: int = 0, limit: int = 100) -> List[models.Pr
 
 
 # KnowledgeItem CRUD operations
-def create_knowledge_item(db: Session, knowledge_item: schemas.KnowledgeItemCreate) -> models.KnowledgeItem:
+def compute_content_hash(content: Optional[str]) -> str:
+    """Return the sha256 hex digest of NFC-normalized, stripped, lowercased content."""
+    normalized = unicodedata.normalize("NFC", content or "").strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def get_knowledge_item_by_hash(db: Session, project_id: UUID, content_hash: str) -> Optional[models.KnowledgeItem]:
+    return db.query(models.KnowledgeItem).filter(models.KnowledgeItem.content_hash == content_hash).filter(models.KnowledgeItem.project_id == project_id).first()
+
+def create_knowledge_item(db: Session, knowledge_item: schemas.KnowledgeItemCreate, dedupe: bool = False) -> models.KnowledgeItem:
+    """
+    Create a knowledge item.
+
+    Args:
+        db: Database session
+        knowledge_item: Knowledge item data
+        dedupe: If True, return the existing item in the same project with the
+            same normalized content instead of inserting a duplicate
+
+    Returns:
+        Created (or, when deduplicating, existing) KnowledgeItem
+    """
     from uuid import UUID
+    # Normalize and hash once; the hash is stored and used for duplicate lookups
+    content_hash = compute_content_hash(knowledge_item.content)
+    if dedupe:
+        existing_item = get_knowledge_item_by_hash(db, knowledge_item.project_id, content_hash)
+        if existing_item:
+            return existing_item
+
     # Convert video_id from string to UUID if provided
     video_id_uuid = None
     if knowledge_item.video_id:
@@ -153,6 +182,7 @@ def create_knowledge_item(db: Session, knowledge_item: schemas.KnowledgeItemCrea
         project_id=knowledge_item.project_id,
         video_id=video_id_uuid,
         content=knowledge_item.content,
+        content_hash=content_hash,
         source_url=knowledge_item.source_url,
         source_type=knowledge_item.source_type,
         processing_status=knowledge_item.processing_status,
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from backend.database import Base
@@ -51,6 +51,7 @@ class KnowledgeItem(Base):
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"))
     video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id"), nullable=True)
     content = Column(Text)
+    content_hash = Column(String(64), nullable=True)  # sha256 of normalized content, used for dedup lookups
     source_url = Column(String)
     source_type = Column(String)  # e.g., 'video', 'scraped'
     processing_status = Column(String, default="pending")  # pending, processing, completed, failed
@@ -62,6 +63,10 @@ class KnowledgeItem(Base):
     video = relationship("Video", back_populates="knowledge_items")
     project = relationship("Project", back_populates="knowledge_items")
 
+    __table_args__ = (
+        Index("ix_ki_hash", "content_hash", unique=False),
+    )
+
 class ChatThread(Base):
     __tablename__ = "chat_threads"
 
@@ -1,9 +1,14 @@
+import asyncio
+import atexit
 import logging
+import os
 import requests
 import io
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Dict, Any
 from urllib.parse import urlparse
 import re
+import threading
 import time
 from fake_useragent import UserAgent
 
@@ -36,6 +41,141 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# PDF text extraction is CPU-bound, so async callers parse in a process pool.
+# Created on first use so importing this module (Celery workers, tests) spawns nothing.
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the PDF parsing pool, creating it and its exit hook on first use"""
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        with _PDF_POOL_LOCK:
+            if _PDF_POOL is None:
+                _PDF_POOL = ProcessPoolExecutor(max_workers=min(6, os.cpu_count() or 1))
+                atexit.register(_shutdown_pdf_pool)
+    return _PDF_POOL
+
+
+def _shutdown_pdf_pool():
+    """Stop the PDF parsing pool's workers, if it was ever created"""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        pool, _PDF_POOL = _PDF_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# arxiv asks clients to keep at least 3 seconds between requests
+ARXIV_MIN_INTERVAL = 3.0
+# Backoff doubles the spacing after each throttling response, up to this ceiling
+ARXIV_MAX_INTERVAL = 48.0
+ARXIV_BACKOFF_SECONDS = 60
+ARXIV_THROTTLE_STATUSES = (429, 503)
+
+
+class ArxivRateLimiter:
+    """Process-wide limiter that spaces out requests to arxiv"""
+
+    def __init__(self, min_interval: float = ARXIV_MIN_INTERVAL, max_interval: float = ARXIV_MAX_INTERVAL):
+        self.base_interval = min_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._lock = threading.RLock()
+        self._next_allowed = 0.0
+
+    def wait(self):
+        """Block until the next arxiv request is allowed"""
+        with self._lock:
+            delay = self._next_allowed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_allowed = time.monotonic() + self.min_interval
+
+    def backoff(self, seconds: float = ARXIV_BACKOFF_SECONDS):
+        """Pause arxiv requests and halve the request rate after a throttling response"""
+        with self._lock:
+            self.min_interval = min(self.min_interval * 2, self.max_interval)
+            self._next_allowed = max(self._next_allowed, time.monotonic() + seconds)
+            logger.warning(f"Arxiv throttled us, pausing {seconds}s and spacing requests {self.min_interval}s apart")
+
+    def reset(self):
+        """Return to the normal request spacing after a successful arxiv request"""
+        with self._lock:
+            self.min_interval = self.base_interval
+
+
+# Shared by every scraper thread and async caller in this process
+arxiv_rate_limiter = ArxivRateLimiter()
+
+
+def _parse_pdf_fitz(data: bytes) -> Optional[str]:
+    """Extract text from PDF bytes using PyMuPDF (fitz)"""
+    try:
+        # Open PDF from bytes
+        doc = fitz.open(stream=data, filetype="pdf")
+        text = ""
+
+        # Extract text from each page
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            page_text = page.get_text()
+
+            # Skip pages with very little text (likely images/figures)
+            if len(page_text.strip()) > 50:  # Minimum 50 characters
+                text += page_text + "\n\n"
+
+        doc.close()
+
+        if text.strip():
+            logger.info(f"Successfully extracted {len(text)} characters from PDF")
+            return text.strip()
+        else:
+            logger.warning("No text content found in PDF")
+            return None
+
+    except Exception as e:
+        logger.error(f"Error with PyMuPDF: {e}")
+        return None
+
+
+def _parse_pdf_pdfplumber(data: bytes) -> Optional[str]:
+    """Extract text from PDF bytes using pdfplumber (fallback)"""
+    try:
+        text = ""
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                if page_text and len(page_text.strip()) > 50:
+                    text += page_text + "\n\n"
+
+        if text.strip():
+            logger.info(f"Successfully extracted {len(text)} characters from PDF using pdfplumber")
+            return text.strip()
+        else:
+            logger.warning("No text content found in PDF")
+            return None
+
+    except Exception as e:
+        logger.error(f"Error with pdfplumber: {e}")
+        return None
+
+
+def _parse_pdf(data: bytes) -> Optional[str]:
+    """
+    Extract text from PDF bytes with the best available library.
+
+    Kept at module level so it can be pickled and dispatched to the PDF pool.
+    """
+    if HAS_FITZ:
+        return _parse_pdf_fitz(data)
+    elif HAS_PDFPLUMBER:
+        return _parse_pdf_pdfplumber(data)
+    else:
+        logger.error("No PDF processing library available")
+        return None
+
+
 class ScrapingService:
     """Service for scraping different types of content sources"""
 
@@ -90,6 +230,49 @@ class ScrapingService:
             logger.error(f"Error scraping {source_type} from {source_url}: {e}")
             return None
 
+    async def scrape_content_async(self, source_url: str, source_type: str, content: str = "") -> Optional[str]:
+        """
+        Async variant of scrape_content.
+
+        Network lookups run in a worker thread and PDF text extraction runs in
+        the PDF process pool, so several PDFs can be parsed on separate cores concurrently.
+        Non-PDF sources fall back to the sync scraper in a worker thread.
+
+        Args:
+            source_url: URL of the content to scrape
+            source_type: Type of source (pdf, video, arxiv-no-link, tool, etc.)
+            content: Additional content/title for arxiv-no-link type
+
+        Returns:
+            str: Scraped content or None if failed
+        """
+        try:
+            if source_type == 'pdf':
+                pdf_url = source_url
+            elif source_type == 'arxiv-no-link':
+                pdf_url = await asyncio.to_thread(self._find_arxiv_pdf_url_by_title, content)
+            elif source_type not in ('video', 'tool') and self._is_pdf_url(source_url):
+                pdf_url = source_url
+            elif source_type not in ('video', 'tool') and self._is_arxiv_url(source_url):
+                pdf_url = await asyncio.to_thread(self._find_arxiv_pdf_url_by_url, source_url)
+            else:
+                return await asyncio.to_thread(self.scrape_content, source_url, source_type, content)
+
+            if not pdf_url:
+                return None
+
+            logger.info(f"Scraping PDF from: {pdf_url}")
+            data = await asyncio.to_thread(self._download_pdf, pdf_url)
+            if data is None:
+                return None
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_pdf_pool(), _parse_pdf, data)
+
+        except Exception as e:
+            logger.error(f"Error scraping {source_type} from {source_url}: {e}")
+            return None
+
     def _is_pdf_url(self, url: str) -> bool:
         """Check if URL points to a PDF file"""
         if not url:
@@ -150,79 +333,58 @@ class ScrapingService:
         logger.info(f"Scraping PDF from: {url}")
 
         try:
-            # Try PyMuPDF (fitz) first
-            if HAS_FITZ:
-                return self._scrape_pdf_fitz(url)
-            elif HAS_PDFPLUMBER:
-                return self._scrape_pdf_pdfplumber(url)
-            else:
+            if not HAS_FITZ and not HAS_PDFPLUMBER:
                 logger.error("No PDF processing library available")
                 return None
 
+            data = self._download_pdf(url)
+            if data is None:
+                return None
+
+            return _parse_pdf(data)
+
         except Exception as e:
             logger.error(f"Error scraping PDF {url}: {e}")
             return None
 
-    def _scrape_pdf_fitz(self, url: str) -> Optional[str]:
-        """Scrape PDF using PyMuPDF (fitz)"""
+    def _download_pdf(self, url: str) -> Optional[bytes]:
+        """Download raw PDF bytes"""
+        is_arxiv = self._is_arxiv_url(url)
         try:
-            # Download PDF
+            if is_arxiv:
+                arxiv_rate_limiter.wait()
+
             response = self.session.get(url, timeout=30)
+            if is_arxiv and response.status_code in ARXIV_THROTTLE_STATUSES:
+                arxiv_rate_limiter.backoff()
             response.raise_for_status()
-
-            # Open PDF from bytes
-            doc = fitz.open(stream=response.content, filetype="pdf")
-            text = ""
-
-            # Extract text from each page
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                page_text = page.get_text()
-
-                # Skip pages with very little text (likely images/figures)
-                if len(page_text.strip()) > 50:  # Minimum 50 characters
-                    text += page_text + "\n\n"
-
-            doc.close()
-
-            if text.strip():
-                logger.info(f"Successfully extracted {len(text)} characters from PDF")
-                return text.strip()
-            else:
-                logger.warning("No text content found in PDF")
-                return None
+            if is_arxiv:
+                arxiv_rate_limiter.reset()
+            return response.content
 
         except Exception as e:
-            logger.error(f"Error with PyMuPDF: {e}")
+            logger.error(f"Error downloading PDF {url}: {e}")
             return None
 
-    def _scrape_pdf_pdfplumber(self, url: str) -> Optional[str]:
-        """Scrape PDF using pdfplumber (fallback)"""
+    def _fetch_arxiv_results(self, client, search) -> list:
+        """Run an arxiv search under the shared rate limiter"""
+        arxiv_rate_limiter.wait()
         try:
-            # Download PDF
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-
-            text = ""
-            with pdfplumber.open(io.BytesIO(response.content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text and len(page_text.strip()) > 50:
-                        text += page_text + "\n\n"
-
-            if text.strip():
-                logger.info(f"Successfully extracted {len(text)} characters from PDF using pdfplumber")
-                return text.strip()
-            else:
-                logger.warning("No text content found in PDF")
-                return None
-
-        except Exception as e:
-            logger.error(f"Error with pdfplumber: {e}")
-            return None
+            results = list(client.results(search))
+        except arxiv.HTTPError as e:
+            if e.status in ARXIV_THROTTLE_STATUSES:
+                arxiv_rate_limiter.backoff()
+            raise
+        arxiv_rate_limiter.reset()
+        return results
 
     def _scrape_arxiv_by_title(self, title: str) -> Optional[str]:
         """Search arxiv by title and scrape the PDF"""
+        pdf_url = self._find_arxiv_pdf_url_by_title(title)
+        return self._scrape_pdf(pdf_url) if pdf_url else None
+
+    def _find_arxiv_pdf_url_by_title(self, title: str) -> Optional[str]:
+        """Search arxiv by title and return the PDF URL of the best match"""
         if not HAS_ARXIV:
             logger.warning("Arxiv library not available")
             return None
@@ -246,14 +408,13 @@ class ScrapingService:
                 max_results=1,
                 sort_by=arxiv.SortCriterion.Relevance
             )
-            results_exact = list(client.results(search_exact))
+            results_exact = self._fetch_arxiv_results(client, search_exact)
 
             if results_exact:
                 paper = results_exact[0]
                 logger.info(f"Found exact match: {paper.title}")
                 if self._is_title_match(title, paper.title):
-                    pdf_url = paper.pdf_url
-                    return self._scrape_pdf(pdf_url)
+                    return paper.pdf_url
 
             # Strategy 2: Try simplified query with key terms
             logger.info("Strategy 2: Simplified query with key terms")
@@ -267,7 +428,7 @@ class ScrapingService:
                 max_results=5,  # Get more results to find the right one
                 sort_by=arxiv.SortCriterion.Relevance
             )
-            results_simplified = list(client.results(search_simplified))
+            results_simplified = self._fetch_arxiv_results(client, search_simplified)
 
             # Look for the best title match
             best_match = None
@@ -282,8 +443,7 @@ class ScrapingService:
 
             if best_match and best_score > 0.5:  # Threshold for good match
                 logger.info(f"Best match found: {best_match.title} (score: {best_score})")
-                pdf_url = best_match.pdf_url
-                return self._scrape_pdf(pdf_url)
+                return best_match.pdf_url
 
             # Strategy 3: Try the original query as fallback
             logger.info("Strategy 3: Original query as fallback")
@@ -292,7 +452,7 @@ class ScrapingService:
                 max_results=5,
                 sort_by=arxiv.SortCriterion.Relevance
             )
-            results_original = list(client.results(search_original))
+            results_original = self._fetch_arxiv_results(client, search_original)
 
             # Look for any paper that contains key terms
             key_terms_lower = [term.lower() for term in key_terms]
@@ -300,8 +460,7 @@ class ScrapingService:
                 paper_title_lower = paper.title.lower()
                 if any(term in paper_title_lower for term in key_terms_lower):
                     logger.info(f"Fallback match found: {paper.title}")
-                    pdf_url = paper.pdf_url
-                    return self._scrape_pdf(pdf_url)
+                    return paper.pdf_url
 
             logger.warning(f"No suitable arxiv results found for title: {title}")
             return None
@@ -357,6 +516,11 @@ class ScrapingService:
 
     def _scrape_arxiv_by_url(self, url: str) -> Optional[str]:
         """Scrape arxiv paper by URL"""
+        pdf_url = self._find_arxiv_pdf_url_by_url(url)
+        return self._scrape_pdf(pdf_url) if pdf_url else None
+
+    def _find_arxiv_pdf_url_by_url(self, url: str) -> Optional[str]:
+        """Look up an arxiv paper by URL and return its PDF URL"""
         if not url or not HAS_ARXIV:
             return None
 
@@ -372,7 +536,7 @@ class ScrapingService:
             # Use modern arxiv Client API
             client = arxiv.Client()
             search = arxiv.Search(id_list=[arxiv_id])
-            results = list(client.results(search))
+            results = self._fetch_arxiv_results(client, search)
 
             if not results:
                 logger.warning(f"No arxiv paper found for ID: {arxiv_id}")
@@ -381,9 +545,7 @@ class ScrapingService:
             paper = results[0]
             logger.info(f"Found arxiv paper: {paper.title}")
 
-            # Get PDF URL and scrape it
-            pdf_url = paper.pdf_url
-            return self._scrape_pdf(pdf_url)
+            return paper.pdf_url
 
         except Exception as e:
             logger.error(f"Error scraping arxiv URL {url}: {e}")
@@ -503,6 +665,10 @@ def scrape_content(source_url: str, source_type: str, content: str = "") -> Opti
     """Scrape content based on source type"""
     return scraping_service.scrape_content(source_url, source_type, content)
 
+async def scrape_content_async(source_url: str, source_type: str, content: str = "") -> Optional[str]:
+    """Scrape content based on source type, parsing PDFs in a process pool"""
+    return await scraping_service.scrape_content_async(source_url, source_type, content)
+
 def scrape_pdf(url: str) -> Optional[str]:
     """Scrape PDF content"""
     return scraping_service._scrape_pdf(url)
@@ -300,8 +300,9 @@ def scrape_sources_task(self, knowledge_item_id: str) -> dict:
 
         # Only update content if we have new scraped content
         if cleaned_content and cleaned_content.strip():
-            # Update knowledge item with cleaned scraped content
+            # Update knowledge item with cleaned scraped content; keep the dedupe hash in step
             db_knowledge_item.content = cleaned_content
+            db_knowledge_item.content_hash = crud.compute_content_hash(cleaned_content)
             db.add(db_knowledge_item)
             db.commit()
         else:
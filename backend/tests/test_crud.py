@@ -93,6 +93,23 @@ def test_create_knowledge_item(test_db, db: Session):
     assert isinstance(knowledge_item.id, UUID)
 
 
+def test_create_knowledge_item_dedupe(test_db, db: Session):
+    """Test that dedupe returns the existing item for normalized duplicate content"""
+    projects = crud.get_projects(db)
+    project_id = projects[0].id
+
+    knowledge_data = schemas.KnowledgeItemCreate(
+        project_id=project_id,
+        content="  TEST knowledge content  ",
+        source_url="https://example.com/test"
+    )
+
+    knowledge_item = crud.create_knowledge_item(db, knowledge_data, dedupe=True)
+
+    assert knowledge_item.content == "Test knowledge content"
+    assert knowledge_item.content_hash == crud.compute_content_hash("test knowledge content")
+
+
 def test_get_knowledge_items_by_project(test_db, db: Session):
     """Test retrieving knowledge items by project"""
     projects = crud.get_projects(db)
@@ -7,6 +7,8 @@ This script tests the three-step RAG workflow with thread persistence.
 import asyncio
 import uuid
 import pytest
+from types import SimpleNamespace
+from langchain_core.messages import AIMessage, HumanMessage
 from backend.agents.langgraph_agent import LangGraphAgent
 
 async def test_langgraph_agent():
@@ -168,6 +170,106 @@ async def test_conversation_state_persistence():
     print("=" * 50)
     print("Conversation state persistence test completed.")
 
+class _FakeCheckpointer:
+    """In-memory stand-in for the checkpointer: one thread, latest messages only"""
+
+    def __init__(self):
+        self.messages = []
+        self.read_started = asyncio.Event()
+        self.release_read = None  # Set to an Event to hold reads until it is set
+
+    async def alist(self, config, limit=None):
+        snapshot = list(self.messages)
+        self.read_started.set()
+        if self.release_read is not None:
+            await self.release_read.wait()
+        yield SimpleNamespace(checkpoint={"channel_values": {"messages": snapshot}})
+
+
+class _FakeGraph:
+    """Stand-in for the compiled graph that appends an AI reply without calling an LLM"""
+
+    def __init__(self, checkpointer):
+        self.checkpointer = checkpointer
+
+    async def ainvoke(self, state, config):
+        self.checkpointer.messages = state["messages"] + [AIMessage(content="reply")]
+        return {"final_response": "reply", "generated_queries": [], "retrieval_results": []}
+
+
+def _offline_agent():
+    """LangGraphAgent wired to the fakes, so no database or model is needed"""
+    agent = LangGraphAgent(checkpointer_url=":memory:")
+    agent.checkpointer = _FakeCheckpointer()
+    agent.graph = _FakeGraph(agent.checkpointer)
+    agent._is_initialized = True
+    return agent
+
+
+async def test_process_query_invalidates_cached_history():
+    """A cached chat history is dropped once process_query writes to the thread"""
+    agent = _offline_agent()
+    thread_id = str(uuid.uuid4())
+
+    assert await agent.get_chat_history(thread_id) == []
+    assert thread_id in agent._history_cache
+
+    result = await agent.process_query(query="Hello", project_id="p", thread_id=thread_id)
+    assert result["success"]
+    assert thread_id not in agent._history_cache
+    # With no read in flight the write leaves no version bookkeeping behind
+    assert thread_id not in agent._history_versions
+
+    history = await agent.get_chat_history(thread_id)
+    assert [message["type"] for message in history] == ["human", "ai"]
+
+
+async def test_history_read_overlapping_a_write_is_not_cached():
+    """A read that started before a write finished must not cache its stale snapshot"""
+    agent = _offline_agent()
+    thread_id = str(uuid.uuid4())
+    agent.checkpointer.release_read = asyncio.Event()
+
+    reader = asyncio.create_task(agent.get_chat_history(thread_id))
+    await agent.checkpointer.read_started.wait()
+
+    # A write lands while the read is still in flight
+    agent.checkpointer.messages = [AIMessage(content="written during the read")]
+    agent._invalidate_chat_history(thread_id)
+    agent.checkpointer.release_read.set()
+
+    assert await reader == []
+    assert thread_id not in agent._history_cache
+
+    agent.checkpointer.release_read = None
+    assert len(await agent.get_chat_history(thread_id)) == 1
+    # Version bookkeeping only lives while reads are in flight
+    assert agent._history_versions == {} and agent._history_reads == {}
+
+async def test_chat_history_length_matches_history():
+    """get_chat_history_length agrees with len(get_chat_history()), cached or not"""
+    agent = _offline_agent()
+    thread_id = str(uuid.uuid4())
+    agent.checkpointer.messages = [
+        HumanMessage(content="Hello"),
+        AIMessage(content="Hi there"),
+        HumanMessage(content="What is LangGraph?"),
+    ]
+
+    # Uncached: counted straight from the checkpoint
+    assert await agent.get_chat_history_length(thread_id) == 3
+    assert thread_id not in agent._history_cache
+
+    # Cached: counted from the formatted history
+    history = await agent.get_chat_history(thread_id)
+    assert thread_id in agent._history_cache
+    assert await agent.get_chat_history_length(thread_id) == len(history) == 3
+
+    # After a write the cache is dropped and the count follows the new checkpoint
+    await agent.process_query(query="Tell me more", project_id="p", thread_id=thread_id)
+    assert thread_id not in agent._history_cache
+    assert await agent.get_chat_history_length(thread_id) == len(await agent.get_chat_history(thread_id)) == 5
+
 if __name__ == "__main__":
     print("LangGraph Agent Test Suite")
     print("=" * 50)
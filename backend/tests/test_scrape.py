@@ -0,0 +1,206 @@
+import pytest
+from unittest.mock import Mock, patch
+
+import requests
+
+from backend.services import scrape
+from backend.services.scrape import ArxivRateLimiter, ScrapingService, _parse_pdf, HAS_FITZ, HAS_PDFPLUMBER
+
+PDF_URL = "https://example.com/papers/tiny.pdf"
+ARXIV_PDF_URL = "https://arxiv.org/pdf/1706.03762"
+PDF_TEXT = "Tiny test document used to check that PDF text extraction works end to end."
+
+requires_pdf_library = pytest.mark.skipif(
+    not (HAS_FITZ or HAS_PDFPLUMBER), reason="no PDF processing library installed"
+)
+
+
+def _tiny_pdf(text: str) -> bytes:
+    """Build a one-page PDF showing text in Helvetica, with a valid xref table"""
+    stream = f"BT /F1 10 Tf 20 400 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return pdf
+
+
+def _service_returning(response) -> ScrapingService:
+    """A ScrapingService whose HTTP session hands back the given response"""
+    service = ScrapingService()
+    service.session = Mock()
+    service.session.get.return_value = response
+    return service
+
+
+def _pdf_response(data: bytes) -> Mock:
+    response = Mock(status_code=200, content=data)
+    response.raise_for_status.return_value = None
+    return response
+
+
+def test_download_pdf_returns_response_bytes():
+    """Test that _download_pdf returns the raw body and nothing else"""
+    data = _tiny_pdf(PDF_TEXT)
+    service = _service_returning(_pdf_response(data))
+
+    assert service._download_pdf(PDF_URL) == data
+    service.session.get.assert_called_once_with(PDF_URL, timeout=30)
+
+
+def test_download_pdf_returns_none_on_http_error():
+    """Test that an HTTP error is logged and reported as no content"""
+    response = Mock(status_code=404)
+    response.raise_for_status.side_effect = requests.HTTPError("404 Client Error")
+    service = _service_returning(response)
+
+    assert service._download_pdf(PDF_URL) is None
+
+
+@requires_pdf_library
+def test_parse_pdf_extracts_text():
+    """Test that _parse_pdf extracts the text of a tiny in-memory PDF"""
+    text = _parse_pdf(_tiny_pdf(PDF_TEXT))
+
+    assert text is not None
+    assert "Tiny test document" in text
+
+
+def test_pdf_pool_is_created_lazily_and_shut_down():
+    """Test that the PDF process pool only exists between first use and shutdown"""
+    scrape._shutdown_pdf_pool()
+    assert scrape._PDF_POOL is None
+
+    pool = scrape._get_pdf_pool()
+    try:
+        assert scrape._get_pdf_pool() is pool
+    finally:
+        scrape._shutdown_pdf_pool()
+    assert scrape._PDF_POOL is None
+
+
+@requires_pdf_library
+async def test_scrape_content_async_parses_pdf_in_pool():
+    """Test that scrape_content_async downloads a PDF and parses it in the process pool"""
+    service = _service_returning(_pdf_response(_tiny_pdf(PDF_TEXT)))
+
+    try:
+        text = await service.scrape_content_async(PDF_URL, "pdf")
+    finally:
+        scrape._shutdown_pdf_pool()
+
+    assert text is not None
+    assert "Tiny test document" in text
+    service.session.get.assert_called_once_with(PDF_URL, timeout=30)
+
+
+async def test_scrape_content_async_skips_parsing_when_download_fails():
+    """Test that a failed download returns None without touching the process pool"""
+    response = Mock(status_code=500)
+    response.raise_for_status.side_effect = requests.HTTPError("500 Server Error")
+    service = _service_returning(response)
+
+    with patch("backend.services.scrape._get_pdf_pool") as get_pool:
+        assert await service.scrape_content_async(PDF_URL, "pdf") is None
+    get_pool.assert_not_called()
+
+
+class _FakeClock:
+    """Stands in for time.monotonic/time.sleep; sleeping advances the clock instantly"""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    fake = _FakeClock()
+    with patch("backend.services.scrape.time.monotonic", fake.monotonic), \
+         patch("backend.services.scrape.time.sleep", fake.sleep):
+        yield fake
+
+
+def test_rate_limiter_wait_spaces_requests(clock):
+    """Test that wait() only sleeps for what is left of the minimum interval"""
+    limiter = ArxivRateLimiter(min_interval=3.0)
+
+    limiter.wait()
+    assert clock.sleeps == []
+
+    clock.now += 1.0
+    limiter.wait()
+    assert clock.sleeps == [2.0]
+
+    clock.now += 5.0
+    limiter.wait()
+    assert clock.sleeps == [2.0]
+
+
+def test_rate_limiter_backoff_pauses_and_caps_interval(clock):
+    """Test that backoff() pauses requests and doubles the spacing up to max_interval"""
+    limiter = ArxivRateLimiter(min_interval=3.0, max_interval=10.0)
+
+    limiter.backoff(seconds=60)
+    assert limiter.min_interval == 6.0
+    limiter.backoff(seconds=60)
+    limiter.backoff(seconds=60)
+    assert limiter.min_interval == 10.0
+
+    limiter.wait()
+    assert clock.sleeps == [60]
+
+
+def test_rate_limiter_reset_restores_base_interval(clock):
+    """Test that reset() returns to the configured spacing after a backoff"""
+    limiter = ArxivRateLimiter(min_interval=3.0, max_interval=10.0)
+    limiter.backoff(seconds=0)
+
+    limiter.reset()
+
+    assert limiter.min_interval == 3.0
+
+
+def test_download_pdf_resets_limiter_after_arxiv_success():
+    """Test that a successful arxiv download waits its turn and then resets the backoff"""
+    service = _service_returning(_pdf_response(b"%PDF-1.4"))
+
+    with patch("backend.services.scrape.arxiv_rate_limiter") as limiter:
+        assert service._download_pdf(ARXIV_PDF_URL) == b"%PDF-1.4"
+
+    limiter.wait.assert_called_once_with()
+    limiter.reset.assert_called_once_with()
+    limiter.backoff.assert_not_called()
+
+
+def test_download_pdf_backs_off_when_arxiv_throttles():
+    """Test that a 429 from arxiv triggers backoff instead of a reset"""
+    response = Mock(status_code=429)
+    response.raise_for_status.side_effect = requests.HTTPError("429 Too Many Requests")
+    service = _service_returning(response)
+
+    with patch("backend.services.scrape.arxiv_rate_limiter") as limiter:
+        assert service._download_pdf(ARXIV_PDF_URL) is None
+
+    limiter.backoff.assert_called_once_with()
+    limiter.reset.assert_not_called()
@@ -1,12 +1,70 @@
-from phoenix.otel import register
 import logging
+import os
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.sampling import ALWAYS_OFF
 
 # Configure logging to reduce noise
 logging.getLogger("opentelemetry").setLevel(logging.WARNING)
 
-# Register Phoenix with selective instrumentation (disable auto_instrument to prevent GeneratorExit issues)
-tracer_provider = register(
-  project_name="learned",
-  endpoint="http://localhost:6006/v1/traces",
-  auto_instrument=False  # Disable auto-instrumentation to prevent interference with async generators
-)
+_tracer_provider = None   # Provider handed out to instrumentors
+_phoenix_provider = None  # Phoenix provider, registered at most once per process
+
+
+def _otel_disabled() -> bool:
+    """Tests set LEARNED_DISABLE_OTEL=1 to keep span processors and exporters out entirely"""
+    return os.getenv("LEARNED_DISABLE_OTEL") == "1"
+
+
+def _register_phoenix():
+    """Register Phoenix once and return its tracer provider"""
+    global _phoenix_provider
+    if _phoenix_provider is None:
+        from phoenix.otel import register
+
+        # Register Phoenix with selective instrumentation (disable auto_instrument to prevent GeneratorExit issues)
+        _phoenix_provider = register(
+          project_name="learned",
+          endpoint="http://localhost:6006/v1/traces",
+          auto_instrument=False  # Disable auto-instrumentation to prevent interference with async generators
+        )
+    return _phoenix_provider
+
+
+def install_noop_tracer():
+    """Make the active provider one that samples nothing, so no spans are built or exported"""
+    global _tracer_provider
+    _tracer_provider = TracerProvider(sampler=ALWAYS_OFF)
+    return _tracer_provider
+
+
+def install_real_tracer():
+    """Make the Phoenix provider active (falls back to the no-op provider when OTel is disabled)"""
+    global _tracer_provider
+    if _otel_disabled():
+        return install_noop_tracer()
+    _tracer_provider = _register_phoenix()
+    return _tracer_provider
+
+
+def get_tracer_provider():
+    """Return the active tracer provider, registering Phoenix on first use"""
+    if _tracer_provider is None:
+        return install_real_tracer()
+    return _tracer_provider
+
+
+def ensure_installed() -> bool:
+    """Make sure a tracer provider is active; cheap and idempotent after the first call.
+    Returns whether the active provider is Phoenix's rather than the no-op one."""
+    if _tracer_provider is None:
+        install_real_tracer()
+    return _phoenix_provider is not None and _tracer_provider is _phoenix_provider
+
+
+def __getattr__(name):
+    # `from backend.trace.arize import tracer_provider` keeps working, but the
+    # exporter is only started when the provider is actually requested
+    if name == "tracer_provider":
+        return get_tracer_provider()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,23 @@
+import pytest
+import pytest_asyncio
+from pytest_asyncio import is_async_test
+
+pytest_plugins = ["pytest_asyncio"]
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session loop so async singletons outlive a single test"""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def agent():
+    """Shared LangGraphAgent (and its checkpointer connection) for the async test scripts"""
+    from backend.agents.langgraph_agent import LangGraphAgent
+
+    agent = LangGraphAgent()
+    yield agent
+    await agent.cleanup()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Run the LangGraph isolation and real-issue investigation scripts on one event loop.
+"""
+
+import asyncio
+import sys
+
+from _harness import get_loop_factory
+from _logging import setup_stdout_logging
+from test_langgraph_isolation import main as isolation_main
+from test_real_issue import main as real_issue_main
+
+
+async def run_all() -> int:
+    """Run each script's main() in turn and return the first non-zero exit code"""
+    exit_code = await isolation_main()
+    return exit_code or await real_issue_main()
+
+
+if __name__ == "__main__":
+    setup_stdout_logging()
+    with asyncio.Runner(loop_factory=get_loop_factory()) as runner:
+        exit_code = runner.run(run_all())
+    sys.exit(exit_code)
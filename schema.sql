@@ -141,6 +141,7 @@ CREATE TABLE public.knowledge_items (
     project_id uuid,
     video_id uuid,
     content text,
+    content_hash character varying(64),
     source_url character varying,
     source_type character varying,
     processing_status character varying,
@@ -312,6 +313,13 @@ CREATE INDEX ix_chat_messages_id ON public.chat_messages USING btree (id);
 CREATE INDEX ix_chat_threads_id ON public.chat_threads USING btree (id);
 
 
+--
+-- Name: ix_ki_hash; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX ix_ki_hash ON public.knowledge_items USING btree (content_hash);
+
+
 --
 -- Name: ix_knowledge_items_id; Type: INDEX; Schema: public; Owner: postgres
 --
@@ -16,9 +16,12 @@ async def test_arize_integration():
     try:
         print("🔧 Testing Arize Phoenix integration fixes...")
 
-        # Import the tracer provider
-        from backend.trace.arize import tracer_provider
-        print("✅ Tracer provider imported successfully")
+        # Install the tracer provider
+        from backend.trace.arize import ensure_installed
+        if ensure_installed():
+            print("✅ Phoenix tracer provider installed successfully")
+        else:
+            print("✅ No-op tracer provider installed (Phoenix disabled or not active)")
 
         # Test that we can import LangGraph agent
         from backend.agents.langgraph_agent import LangGraphAgent
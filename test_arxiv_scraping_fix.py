@@ -3,15 +3,22 @@
 Test script to verify the arxiv scraping fixes.
 """
 
+import asyncio
+import logging
 import sys
 import os
 sys.path.append('backend')
 
+from _logging import setup_queue_logging
 from backend.services.scrape import scrape_arxiv_by_title
 from backend.database import SessionLocal
 from backend import crud, schemas, models
 from uuid import uuid4
 
+# Configure logging: records are queued and written by a background listener thread
+setup_queue_logging()
+logger = logging.getLogger(__name__)
+
 def test_arxiv_scraping():
     """Test the arxiv scraping functionality with the provided title."""
 
@@ -50,15 +57,15 @@ def test_empty_title_handling():
     ]
 
     for title, description in test_cases:
-        print(f"\nTesting {description}: '{title}'")
+        logger.info(f"Testing {description}: '{title}'")
         try:
             result = scrape_arxiv_by_title(title)
             if result:
-                print("✅ SUCCESS: Content returned")
+                logger.info("✅ SUCCESS: Content returned")
             else:
-                print("ℹ️  No content (expected for invalid titles)")
+                logger.info("ℹ️  No content (expected for invalid titles)")
         except Exception as e:
-            print(f"❌ ERROR: {e}")
+            logger.error(f"❌ ERROR: {e}")
 
 def test_database_operations():
     """Test database operations for knowledge items."""
@@ -121,13 +128,21 @@ def test_database_operations():
     finally:
         db.close()
 
+async def _run_all():
+    """Run the scrape tests concurrently, then the database test on its own."""
+    # The scrape tests are independent and network-bound (still throttled by the
+    # shared arxiv rate limiter); the database test shares SessionLocal state.
+    await asyncio.gather(
+        asyncio.to_thread(test_arxiv_scraping),
+        asyncio.to_thread(test_empty_title_handling)
+    )
+    test_database_operations()
+
 if __name__ == "__main__":
     print("Arxiv Scraping Fix Test")
     print("=" * 50)
 
-    test_arxiv_scraping()
-    test_empty_title_handling()
-    test_database_operations()
+    asyncio.run(_run_all())
 
     print("\n" + "=" * 50)
     print("Test completed!")
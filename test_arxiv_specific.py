@@ -2,12 +2,18 @@
 """
 Test script to specifically test arxiv-no-link scraping with the provided content
 """
+import logging
 import sys
 import os
 sys.path.append('/home/kenan/Desktop/ai-apps/learned')
 
+from _logging import setup_queue_logging
 from backend.services.scrape import scrape_content
 
+# Configure logging: records are queued and written by a background listener thread
+setup_queue_logging()
+logger = logging.getLogger(__name__)
+
 def test_specific_arxiv_content():
     """Test the specific arxiv content provided by the user"""
     content = "GRAPH-R1: TOWARDS AGENTIC GRAPHRAG FRAMEWORK VIA END-TO-END REINFORCEMENT LEARNING"
@@ -63,8 +69,8 @@ def test_edge_cases():
 
     results = []
     for test_content, description in test_cases:
-        print(f"\nTesting: {description}")
-        print(f"Content: '{test_content}'")
+        logger.info(f"Testing: {description}")
+        logger.info(f"Content: '{test_content}'")
 
         try:
             result = scrape_content(
@@ -74,14 +80,14 @@ def test_edge_cases():
             )
 
             if result:
-                print(f"✅ Result: {len(result)} characters")
+                logger.info(f"✅ Result: {len(result)} characters")
                 results.append(True)
             else:
-                print("❌ No result")
+                logger.info("❌ No result")
                 results.append(False)
 
         except Exception as e:
-            print(f"❌ Error: {e}")
+            logger.error(f"❌ Error: {e}")
             results.append(False)
 
     success_count = sum(results)
@@ -8,29 +8,29 @@ import asyncio
 import sys
 import os
 import logging
-from typing import List, Dict, Any
+from typing import Dict, Any
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from _logging import setup_queue_logging
+
+# Configure logging: records are queued and written by a background listener thread
+setup_queue_logging()
 logger = logging.getLogger(__name__)
 
-async def test_error_recovery_with_chat_history():
-    """Test that chat history is preserved even when API calls fail"""
+async def _run_error_recovery(agent) -> Dict[str, Any]:
+    """Check that chat history is preserved even when API calls fail"""
     print("🛠️  Testing error recovery with chat history preservation...")
 
     try:
-        # Import Phoenix first to enable instrumentation
-        from backend.trace.arize import tracer_provider
-        print("  ✅ Phoenix tracer provider loaded")
-
-        # Import LangGraph agent
-        from backend.agents.langgraph_agent import LangGraphAgent
-
-        # Create agent instance
-        agent = LangGraphAgent()
+        # Import Phoenix first to enable instrumentation (opt-in via ENABLE_PHOENIX)
+        if os.getenv("ENABLE_PHOENIX"):
+            from backend.trace.arize import ensure_installed
+            if ensure_installed():
+                print("  ✅ Phoenix tracer provider loaded")
+            else:
+                print("  ⚠️  No-op tracer provider already active; Phoenix not loaded")
 
         # Test thread persistence - use same thread ID for multiple runs
         thread_id = "test-thread-recovery-123"
@@ -50,8 +50,8 @@ async def test_error_recovery_with_chat_history():
         print(f"  ✅ First run result: {result1.get('success', False)}")
 
         # Check chat history after first successful run
-        history1 = await agent.get_chat_history(thread_id)
-        print(f"  📊 History after first run: {len(history1)} entries")
+        history1_length = await agent.get_chat_history_length(thread_id)
+        print(f"  📊 History after first run: {history1_length} entries")
 
         # Second run - force an error by using invalid model
         print("  🔄 Second run (invalid model - should fail gracefully)...")
@@ -80,8 +80,8 @@ async def test_error_recovery_with_chat_history():
             print(f"  📝 Error message: {error_messages[0].get('content', '')[:100]}...")
 
         # Check chat history after error - this is the critical test
-        history2 = await agent.get_chat_history(thread_id)
-        print(f"  📊 History after error: {len(history2)} entries")
+        history2_length = await agent.get_chat_history_length(thread_id)
+        print(f"  📊 History after error: {history2_length} entries")
 
         # Third run - should work again with Ollama
         print("  🔄 Third run (Ollama - should work again)...")
@@ -96,16 +96,13 @@ async def test_error_recovery_with_chat_history():
         print(f"  ✅ Third run result: {result3.get('success', False)}")
 
         # Final chat history check
-        history3 = await agent.get_chat_history(thread_id)
-        print(f"  📊 Final history: {len(history3)} entries")
-
-        # Cleanup
-        await agent.cleanup()
+        history3_length = await agent.get_chat_history_length(thread_id)
+        print(f"  📊 Final history: {history3_length} entries")
 
         # Analyze results
         success1 = result1.get('success', False)
         success3 = result3.get('success', False)
-        history_preserved = len(history3) > len(history1)
+        history_preserved = history3_length > history1_length
         error_handled_gracefully = len(chunks) > 0
 
         return {
@@ -114,7 +111,7 @@ async def test_error_recovery_with_chat_history():
             "third_run_success": success3,
             "history_preserved": history_preserved,
             "error_handled_gracefully": error_handled_gracefully,
-            "history_lengths": [len(history1), len(history2), len(history3)],
+            "history_lengths": [history1_length, history2_length, history3_length],
             "error_chunks": len(chunks),
             "error": None
         }
@@ -132,20 +129,18 @@ async def test_error_recovery_with_chat_history():
             "error": str(e)
         }
 
-async def test_rate_limit_simulation():
-    """Simulate Gemini API rate limiting to test error recovery"""
+async def _run_rate_limit_simulation(agent) -> Dict[str, Any]:
+    """Simulate Gemini API rate limiting to check error recovery"""
     print("🔥 Testing Gemini rate limit simulation...")
 
     try:
-        # Import Phoenix first to enable instrumentation
-        from backend.trace.arize import tracer_provider
-        print("  ✅ Phoenix tracer provider loaded")
-
-        # Import LangGraph agent
-        from backend.agents.langgraph_agent import LangGraphAgent
-
-        # Create agent instance
-        agent = LangGraphAgent()
+        # Import Phoenix first to enable instrumentation (opt-in via ENABLE_PHOENIX)
+        if os.getenv("ENABLE_PHOENIX"):
+            from backend.trace.arize import ensure_installed
+            if ensure_installed():
+                print("  ✅ Phoenix tracer provider loaded")
+            else:
+                print("  ⚠️  No-op tracer provider already active; Phoenix not loaded")
 
         # Test thread persistence
         thread_id = "test-thread-rate-limit-456"
@@ -167,8 +162,8 @@ async def test_rate_limit_simulation():
             print(f"  📝 Error message: {result1.get('error', '')[:100]}...")
 
         # Check chat history
-        history1 = await agent.get_chat_history(thread_id)
-        print(f"  📊 History after first run: {len(history1)} entries")
+        history1_length = await agent.get_chat_history_length(thread_id)
+        print(f"  📊 History after first run: {history1_length} entries")
 
         # Second run - should still work even if first failed
         print("  🔄 Second run (Ollama fallback)...")
@@ -183,17 +178,14 @@ async def test_rate_limit_simulation():
         print(f"  ✅ Second run result: {result2.get('success', False)}")
 
         # Check final chat history
-        history2 = await agent.get_chat_history(thread_id)
-        print(f"  📊 Final history: {len(history2)} entries")
-
-        # Cleanup
-        await agent.cleanup()
+        history2_length = await agent.get_chat_history_length(thread_id)
+        print(f"  📊 Final history: {history2_length} entries")
 
         return {
             "success": True,
             "first_run_success": result1.get('success', False),
             "second_run_success": result2.get('success', False),
-            "history_grew": len(history2) > len(history1),
+            "history_grew": history2_length > history1_length,
             "error_recovery": result2.get('success', False),
             "error": None
         }
@@ -209,17 +201,38 @@ async def test_rate_limit_simulation():
             "error": str(e)
         }
 
+async def test_error_recovery_with_chat_history(agent):
+    """Test that chat history is preserved even when API calls fail"""
+    result = await _run_error_recovery(agent)
+    assert result["success"], result["error"]
+    assert result["error_handled_gracefully"], "invalid-model stream produced no chunks"
+    assert result["history_preserved"], f"history did not grow: {result['history_lengths']}"
+
+async def test_rate_limit_simulation(agent):
+    """Test that a failed Gemini call doesn't break the next request on the thread"""
+    result = await _run_rate_limit_simulation(agent)
+    assert result["success"], result["error"]
+    assert result["error_recovery"], "Ollama run after the Gemini run failed"
+    assert result["history_grew"], "history did not grow after the Ollama run"
+
 async def main():
     """Run all error handling tests"""
     print("🚀 Starting Error Handling Fix Tests...\n")
 
-    # Test 1: Error recovery with chat history preservation
-    print("\n" + "="*60)
-    recovery_result = await test_error_recovery_with_chat_history()
+    from backend.agents.langgraph_agent import LangGraphAgent
 
-    # Test 2: Rate limit simulation
-    print("\n" + "="*60)
-    rate_limit_result = await test_rate_limit_simulation()
+    # One agent (and checkpointer connection) shared by both tests
+    agent = LangGraphAgent()
+    try:
+        # Test 1: Error recovery with chat history preservation
+        print("\n" + "="*60)
+        recovery_result = await _run_error_recovery(agent)
+
+        # Test 2: Rate limit simulation
+        print("\n" + "="*60)
+        rate_limit_result = await _run_rate_limit_simulation(agent)
+    finally:
+        await agent.cleanup()
 
     # Results analysis
     print("\n" + "="*70)
@@ -11,59 +11,56 @@ import os
 # Add backend to path
 sys.path.append('backend')
 
+from _logging import setup_queue_logging
 from backend.tools.retriever_tool import async_retriever_tool
 from backend.agents.langgraph_agent import LangGraphAgent
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: records are queued and written by a background listener thread
+setup_queue_logging()
 logger = logging.getLogger(__name__)
 
 async def test_async_retriever():
     """Test the async retriever tool directly"""
-    try:
-        logger.info("Testing async retriever tool...")
-
-        # Test with a simple query
-        results = await async_retriever_tool(
-            query="test query",
-            project_id="test_project",
-            video_ids=None
-        )
+    logger.info("Testing async retriever tool...")
 
-        logger.info(f"Async retriever returned {len(results)} results")
-        return True
+    # Test with a simple query
+    results = await async_retriever_tool(
+        query="test query",
+        project_id="test_project",
+        video_ids=None
+    )
 
-    except Exception as e:
-        logger.error(f"Async retriever test failed: {e}")
-        return False
+    logger.info(f"Async retriever returned {len(results)} results")
+    assert isinstance(results, list)
 
-async def test_langgraph_agent():
+async def test_langgraph_agent(agent):
     """Test the LangGraph agent initialization and basic functionality"""
-    try:
-        logger.info("Testing LangGraph agent...")
-
-        agent = LangGraphAgent()
+    logger.info("Testing LangGraph agent...")
 
-        # Test initialization
-        await agent.initialize()
-        logger.info("LangGraph agent initialized successfully")
+    # Test initialization
+    await agent.initialize()
+    assert agent.graph is not None and agent.checkpointer is not None
+    logger.info("LangGraph agent initialized successfully")
 
-        # Test basic query processing (this might fail if no data exists, but shouldn't crash)
-        try:
-            result = await agent.process_query(
-                query="test query",
-                project_id="test_project",
-                thread_id="test_thread"
-            )
-            logger.info(f"LangGraph query processing completed: {result.get('success', False)}")
-        except Exception as e:
-            logger.warning(f"Query processing failed (expected if no data): {e}")
+    # Test basic query processing (this might fail if no data exists, but shouldn't crash;
+    # a CancelledError is a BaseException, so it still fails the test)
+    try:
+        result = await agent.process_query(
+            query="test query",
+            project_id="test_project",
+            thread_id="test_thread"
+        )
+        logger.info(f"LangGraph query processing completed: {result.get('success', False)}")
+    except Exception as e:
+        logger.warning(f"Query processing failed (expected if no data): {e}")
 
-        await agent.cleanup()
+async def _passed(name: str, test) -> bool:
+    """Await a test coroutine, logging its failure instead of raising"""
+    try:
+        await test
         return True
-
     except Exception as e:
-        logger.error(f"LangGraph agent test failed: {e}")
+        logger.error(f"{name} test failed: {e}")
         return False
 
 async def main():
@@ -71,10 +68,14 @@ async def main():
     logger.info("Starting LangGraph fix verification tests...")
 
     # Test 1: Async retriever
-    test1_passed = await test_async_retriever()
+    test1_passed = await _passed("Async retriever", test_async_retriever())
 
     # Test 2: LangGraph agent
-    test2_passed = await test_langgraph_agent()
+    agent = LangGraphAgent()
+    try:
+        test2_passed = await _passed("LangGraph agent", test_langgraph_agent(agent))
+    finally:
+        await agent.cleanup()
 
     if test1_passed and test2_passed:
         logger.info("✅ All tests passed! The CancelledError fix appears to be working.")
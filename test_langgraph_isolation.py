@@ -8,171 +8,113 @@ import asyncio
 import sys
 import os
 import logging
-from typing import List, Dict, Any
+from typing import Dict, Any
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from backend.trace.arize import install_real_tracer
+from _logging import setup_stdout_logging
+from _harness import (
+    STREAM_TIMEOUT,
+    cleanup_agent,
+    count_until_done,
+    error_line,
+    get_agent,
+    get_loop_factory,
+    instrument_langchain,
+    mark,
+    result_or_failure,
+)
+
+# Logging is configured by __main__ (setup_stdout_logging), not at import
 logger = logging.getLogger(__name__)
 
-async def test_langgraph_without_phoenix():
-    """Test LangGraph streaming without Phoenix instrumentation"""
-    print("🧪 Testing LangGraph WITHOUT Phoenix...")
+# Result shapes reported when a test fails before producing its own result
+_SIMPLE_FAILURE = {"success": False, "chunks": 0}
+_LANGGRAPH_FAILURE = {"success": False, "chunks1": 0, "chunks2": 0, "history_length": 0, "timed_out": False}
 
-    try:
-        # Temporarily disable Phoenix by not importing it
-        # Import LangGraph agent directly
-        from backend.agents.langgraph_agent import LangGraphAgent
-
-        # Create agent instance
-        agent = LangGraphAgent()
-
-        # Test thread persistence - use same thread ID for multiple runs
-        thread_id = "test-thread-123"
 
-        print(f"  📝 Using thread ID: {thread_id}")
-
-        # First run
-        print("  🔄 First run...")
-        chunks1 = []
-        async for chunk in agent.process_query_streaming(
-            query="What is machine learning?",
-            project_id="test-project",
-            thread_id=thread_id,
-            query_generate_llm_model="gemini",
-            chat_llm_model="gemini"
-        ):
-            chunks1.append(chunk)
-            if chunk.get("type") == "done":
-                break
-
-        print(f"  ✅ First run completed with {len(chunks1)} chunks")
-
-        # Second run with same thread
-        print("  🔄 Second run (same thread)...")
-        chunks2 = []
-        async for chunk in agent.process_query_streaming(
-            query="Can you explain this in simpler terms?",
-            project_id="test-project",
-            thread_id=thread_id,
-            query_generate_llm_model="gemini",
-            chat_llm_model="gemini"
-        ):
-            chunks2.append(chunk)
-            if chunk.get("type") == "done":
-                break
-
-        print(f"  ✅ Second run completed with {len(chunks2)} chunks")
-
-        # Check chat history
-        print("  📚 Checking chat history...")
-        history = await agent.get_chat_history(thread_id)
-        print(f"  📊 Chat history has {len(history)} entries")
-
-        # Cleanup
-        await agent.cleanup()
-
-        return {
-            "success": True,
-            "chunks1": len(chunks1),
-            "chunks2": len(chunks2),
-            "history_length": len(history),
-            "error": None
-        }
-
-    except Exception as e:
-        print(f"  ❌ Test failed: {e}")
-        return {
-            "success": False,
-            "chunks1": 0,
-            "chunks2": 0,
-            "history_length": 0,
-            "error": str(e)
-        }
-
-async def test_langgraph_with_phoenix():
-    """Test LangGraph streaming with Phoenix instrumentation"""
-    print("🔭 Testing LangGraph WITH Phoenix...")
+async def _run_langgraph_test(label: str, thread_id: str, enable_phoenix: bool) -> Dict[str, Any]:
+    """Test LangGraph streaming with or without Phoenix instrumentation"""
+    logger.info("\n" + "="*50)
+    logger.info(f"{'🔭' if enable_phoenix else '🧪'} Testing LangGraph {label}...")
 
+    instrumentor = None
     try:
-        # Import Phoenix first to enable instrumentation
-        from backend.trace.arize import tracer_provider
-        print("  ✅ Phoenix tracer provider loaded")
-
-        # Import LangGraph agent
-        from backend.agents.langgraph_agent import LangGraphAgent
+        # Phoenix only sees the agent through LangChain instrumentation, so the WITH
+        # case instruments LangChain with the Phoenix provider and WITHOUT leaves it bare
+        if enable_phoenix:
+            instrumentor = instrument_langchain(install_real_tracer())
+            logger.info("  ✅ LangChain instrumented with the Phoenix tracer provider")
 
-        # Create agent instance
-        agent = LangGraphAgent()
+        # Get the shared agent instance; instrumentation applies at call time, not build time
+        agent = await get_agent()
 
         # Test thread persistence - use same thread ID for multiple runs
-        thread_id = "test-thread-phoenix-456"
-
-        print(f"  📝 Using thread ID: {thread_id}")
+        logger.info(f"  📝 Using thread ID: {thread_id}")
 
         # First run
-        print("  🔄 First run...")
-        chunks1 = []
-        async for chunk in agent.process_query_streaming(
+        logger.info("  🔄 First run...")
+        chunks1_count, timed_out1 = await count_until_done(agent.process_query_streaming(
             query="What is machine learning?",
             project_id="test-project",
             thread_id=thread_id,
             query_generate_llm_model="gemini",
             chat_llm_model="gemini"
-        ):
-            chunks1.append(chunk)
-            if chunk.get("type") == "done":
-                break
+        ))
 
-        print(f"  ✅ First run completed with {len(chunks1)} chunks")
+        if timed_out1:
+            logger.info(f"  ⏱️  Stream timed out after {STREAM_TIMEOUT}s")
+        logger.info(f"  ✅ First run completed with {chunks1_count} chunks")
 
         # Second run with same thread
-        print("  🔄 Second run (same thread)...")
-        chunks2 = []
-        async for chunk in agent.process_query_streaming(
+        logger.info("  🔄 Second run (same thread)...")
+        chunks2_count, timed_out2 = await count_until_done(agent.process_query_streaming(
             query="Can you explain this in simpler terms?",
             project_id="test-project",
             thread_id=thread_id,
             query_generate_llm_model="gemini",
             chat_llm_model="gemini"
-        ):
-            chunks2.append(chunk)
-            if chunk.get("type") == "done":
-                break
+        ))
 
-        print(f"  ✅ Second run completed with {len(chunks2)} chunks")
+        if timed_out2:
+            logger.info(f"  ⏱️  Stream timed out after {STREAM_TIMEOUT}s")
+        logger.info(f"  ✅ Second run completed with {chunks2_count} chunks")
 
         # Check chat history
-        print("  📚 Checking chat history...")
-        history = await agent.get_chat_history(thread_id)
-        print(f"  📊 Chat history has {len(history)} entries")
-
-        # Cleanup
-        await agent.cleanup()
+        logger.info("  📚 Checking chat history...")
+        history_length = await agent.get_chat_history_length(thread_id)
+        logger.info(f"  📊 Chat history has {history_length} entries")
 
         return {
             "success": True,
-            "chunks1": len(chunks1),
-            "chunks2": len(chunks2),
-            "history_length": len(history),
+            "chunks1": chunks1_count,
+            "chunks2": chunks2_count,
+            "history_length": history_length,
+            "timed_out": timed_out1 or timed_out2,
             "error": None
         }
 
     except Exception as e:
-        print(f"  ❌ Test failed: {e}")
-        return {
-            "success": False,
-            "chunks1": 0,
-            "chunks2": 0,
-            "history_length": 0,
-            "error": str(e)
-        }
+        logger.info(f"  ❌ Test failed: {e}")
+        return {**_LANGGRAPH_FAILURE, "error": str(e)}
+    finally:
+        if instrumentor is not None:
+            instrumentor.uninstrument()
+
+async def _run_langgraph_cases():
+    """Run the WITHOUT and WITH Phoenix cases one after the other.
+
+    LangChain instrumentation is process-wide, so while the WITH case has it
+    switched on, an overlapping WITHOUT case would be traced as well."""
+    without_phoenix = await _run_langgraph_test("WITHOUT Phoenix", "test-thread-123", False)
+    with_phoenix = await _run_langgraph_test("WITH Phoenix", "test-thread-phoenix-456", True)
+    return without_phoenix, with_phoenix
 
 async def test_simple_streaming():
     """Test simple async generator without LangGraph to isolate the issue"""
-    print("🔄 Testing simple async generator...")
+    logger.info("🔄 Testing simple async generator...")
 
     try:
         async def simple_generator():
@@ -183,7 +125,7 @@ async def test_simple_streaming():
         async for chunk in simple_generator():
             chunks.append(chunk)
 
-        print(f"  ✅ Simple generator completed with {len(chunks)} chunks")
+        logger.info(f"  ✅ Simple generator completed with {len(chunks)} chunks")
 
         return {
             "success": True,
@@ -192,79 +134,102 @@ async def test_simple_streaming():
         }
 
     except Exception as e:
-        print(f"  ❌ Simple generator test failed: {e}")
-        return {
-            "success": False,
-            "chunks": 0,
-            "error": str(e)
-        }
+        logger.info(f"  ❌ Simple generator test failed: {e}")
+        return {**_SIMPLE_FAILURE, "error": str(e)}
+
+# Report layout, filled once per run by main() via str.format_map
+_RULE = "=" * 60
+_TEMPLATE = f"""
+{_RULE}
+📊 TEST RESULTS COMPARISON
+{_RULE}
+Simple Async Generator:
+  Success: {{simple_ok}}
+  Chunks: {{simple_chunks}}{{simple_error}}
+
+LangGraph WITHOUT Phoenix:
+  Success: {{without_ok}}
+  First run chunks: {{without_chunks1}}
+  Second run chunks: {{without_chunks2}}
+  Chat history entries: {{without_history}}{{without_error}}
+
+LangGraph WITH Phoenix:
+  Success: {{with_ok}}
+  First run chunks: {{with_chunks1}}
+  Second run chunks: {{with_chunks2}}
+  Chat history entries: {{with_history}}{{with_error}}
+
+{_RULE}
+🔍 ANALYSIS
+{_RULE}
+{{analysis}}{{history_analysis}}
+"""
 
 async def main():
     """Run all tests and compare results"""
-    print("🚀 Starting LangGraph Isolation Tests...\n")
+    logger.info("🚀 Starting LangGraph Isolation Tests...\n")
 
-    # Test 1: Simple async generator
-    simple_result = await test_simple_streaming()
-
-    # Test 2: LangGraph without Phoenix
-    print("\n" + "="*50)
-    without_phoenix = await test_langgraph_without_phoenix()
-
-    # Test 3: LangGraph with Phoenix
-    print("\n" + "="*50)
-    with_phoenix = await test_langgraph_with_phoenix()
+    # Only the uninstrumented simple generator overlaps the LangGraph cases,
+    # which share one agent (distinct thread IDs keep them isolated)
+    try:
+        simple_result, langgraph_results = await asyncio.gather(
+            test_simple_streaming(),
+            _run_langgraph_cases(),
+            return_exceptions=True
+        )
+    finally:
+        await cleanup_agent()
+    simple_result = result_or_failure(simple_result, _SIMPLE_FAILURE)
+    if isinstance(langgraph_results, BaseException):
+        langgraph_results = (langgraph_results, langgraph_results)
+    without_phoenix = result_or_failure(langgraph_results[0], _LANGGRAPH_FAILURE)
+    with_phoenix = result_or_failure(langgraph_results[1], _LANGGRAPH_FAILURE)
 
     # Results comparison
-    print("\n" + "="*60)
-    print("📊 TEST RESULTS COMPARISON")
-    print("="*60)
-
-    print("Simple Async Generator:")
-    print(f"  Success: {'✅' if simple_result['success'] else '❌'}")
-    print(f"  Chunks: {simple_result['chunks']}")
-    if simple_result['error']:
-        print(f"  Error: {simple_result['error']}")
-
-    print("\nLangGraph WITHOUT Phoenix:")
-    print(f"  Success: {'✅' if without_phoenix['success'] else '❌'}")
-    print(f"  First run chunks: {without_phoenix['chunks1']}")
-    print(f"  Second run chunks: {without_phoenix['chunks2']}")
-    print(f"  Chat history entries: {without_phoenix['history_length']}")
-    if without_phoenix['error']:
-        print(f"  Error: {without_phoenix['error']}")
-
-    print("\nLangGraph WITH Phoenix:")
-    print(f"  Success: {'✅' if with_phoenix['success'] else '❌'}")
-    print(f"  First run chunks: {with_phoenix['chunks1']}")
-    print(f"  Second run chunks: {with_phoenix['chunks2']}")
-    print(f"  Chat history entries: {with_phoenix['history_length']}")
-    if with_phoenix['error']:
-        print(f"  Error: {with_phoenix['error']}")
+    data = {
+        "simple_ok": mark(simple_result['success']),
+        "simple_chunks": simple_result['chunks'],
+        "simple_error": error_line(simple_result),
+        "without_ok": mark(without_phoenix['success']),
+        "without_chunks1": without_phoenix['chunks1'],
+        "without_chunks2": without_phoenix['chunks2'],
+        "without_history": without_phoenix['history_length'],
+        "without_error": error_line(without_phoenix),
+        "with_ok": mark(with_phoenix['success']),
+        "with_chunks1": with_phoenix['chunks1'],
+        "with_chunks2": with_phoenix['chunks2'],
+        "with_history": with_phoenix['history_length'],
+        "with_error": error_line(with_phoenix),
+    }
 
     # Analysis
-    print("\n" + "="*60)
-    print("🔍 ANALYSIS")
-    print("="*60)
-
     if simple_result['success'] and not without_phoenix['success']:
-        print("⚠️  Issue is NOT with Phoenix - LangGraph itself has problems")
+        data["analysis"] = "⚠️  Issue is NOT with Phoenix - LangGraph itself has problems"
     elif simple_result['success'] and without_phoenix['success'] and not with_phoenix['success']:
-        print("🎯 Issue IS with Phoenix - it interferes with LangGraph streaming")
+        data["analysis"] = "🎯 Issue IS with Phoenix - it interferes with LangGraph streaming"
     elif simple_result['success'] and without_phoenix['success'] and with_phoenix['success']:
-        print("✅ No issues detected - both configurations work")
+        data["analysis"] = "✅ No issues detected - both configurations work"
     else:
-        print("❓ Complex issue - needs further investigation")
+        data["analysis"] = "❓ Complex issue - needs further investigation"
 
     # Chat history analysis
     if without_phoenix['history_length'] > 0 and with_phoenix['history_length'] == 0:
-        print("💔 Chat history is BROKEN with Phoenix - state not persisting")
+        data["history_analysis"] = "\n💔 Chat history is BROKEN with Phoenix - state not persisting"
     elif without_phoenix['history_length'] > 0 and with_phoenix['history_length'] > 0:
-        print("✅ Chat history works in both configurations")
+        data["history_analysis"] = "\n✅ Chat history works in both configurations"
     elif without_phoenix['history_length'] == 0:
-        print("⚠️  Chat history not working even without Phoenix")
+        data["history_analysis"] = "\n⚠️  Chat history not working even without Phoenix"
+    else:
+        data["history_analysis"] = ""
+
+    # Write the whole report at once rather than one flush per line
+    sys.stdout.write(_TEMPLATE.format_map(data))
+    sys.stdout.flush()
 
     return 0
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    setup_stdout_logging()
+    with asyncio.Runner(loop_factory=get_loop_factory()) as runner:
+        exit_code = runner.run(main())
     sys.exit(exit_code)
@@ -2,40 +2,85 @@
 """
 Test script to verify the scrape_sources_task functionality
 """
+import asyncio
 import sys
 import os
+import hashlib
+from functools import lru_cache
+from typing import List, Optional
 sys.path.append('/home/kenan/Desktop/ai-apps/learned')
 
 from backend.services.scrape import scrape_content
 
-def test_arxiv_scraping():
-    """Test arxiv scraping with the problematic paper title"""
-    title = "Systematic Characterization of LLM Quantization: A Performance, Energy, and Quality Perspective"
-
-    print("Testing arxiv scraping with title:")
-    print(f"'{title}'")
+# Persist scrape results across runs when diskcache is available and
+# LEARNED_SCRAPE_CACHE_DIR names a cache directory (off by default, so a
+# normal run always hits the live scrapers)
+try:
+    import diskcache
+    HAS_DISKCACHE = True
+except ImportError:
+    HAS_DISKCACHE = False
+
+SCRAPE_CACHE_TTL = 24 * 60 * 60  # 24 hours
+
+@lru_cache(maxsize=None)
+def _get_disk_cache():
+    """Open the opt-in disk cache on first use, or return None when it is disabled"""
+    cache_dir = os.getenv("LEARNED_SCRAPE_CACHE_DIR")
+    if not (HAS_DISKCACHE and cache_dir):
+        return None
+    return diskcache.Cache(cache_dir)
+
+@lru_cache(maxsize=128)
+def _cached_scrape(source_type: str, content: str):
+    """Scrape once per (source_type, content), reusing results from earlier runs when caching is enabled"""
+    disk_cache = _get_disk_cache()
+    key = hashlib.blake2b(f"{source_type}\0{content}".encode()).hexdigest()
+    if disk_cache is not None:
+        cached = disk_cache.get(key)
+        if cached is not None:
+            return cached
+
+    result = scrape_content("", source_type, content)
+    if disk_cache is not None and result:
+        disk_cache.set(key, result, expire=SCRAPE_CACHE_TTL)
+    return result
+
+ARXIV_TEST_TITLES = [
+    "Systematic Characterization of LLM Quantization: A Performance, Energy, and Quality Perspective",
+    "Attention Is All You Need",
+    "LoRA: Low-Rank Adaptation of Large Language Models",
+]
+
+async def test_arxiv_scraping(titles: Optional[List[str]] = None):
+    """Test arxiv scraping for several paper titles concurrently"""
+    titles = titles or ARXIV_TEST_TITLES
+
+    print(f"Testing arxiv scraping with {len(titles)} titles")
     print("-" * 60)
 
-    try:
-        # Test the scraping function directly
-        result = scrape_content(
-            source_url="",  # Empty URL for arxiv-no-link
-            source_type="arxiv-no-link",
-            content=title
-        )
-
-        if result:
+    # Each scrape blocks on network I/O, so run them in worker threads
+    # (cached, so re-runs skip the arxiv round-trip)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_cached_scrape, "arxiv-no-link", title) for title in titles),
+        return_exceptions=True
+    )
+
+    success = True
+    for title, result in zip(titles, results):
+        print(f"\n'{title}'")
+        if isinstance(result, Exception):
+            print(f"❌ ERROR: {result}")
+            success = False
+        elif result:
             print("✅ SUCCESS: Content scraped successfully!")
             print(f"Content length: {len(result)} characters")
             print(f"First 500 characters:\n{result[:500]}...")
-            return True
         else:
             print("❌ FAILED: No content returned")
-            return False
+            success = False
 
-    except Exception as e:
-        print(f"❌ ERROR: {e}")
-        return False
+    return success
 
 def test_scrape_sources_task():
     """Test the scrape_sources_task function directly"""
@@ -71,7 +116,7 @@ if __name__ == "__main__":
     print("=" * 60)
 
     # Test 1: Direct scraping function
-    success1 = test_arxiv_scraping()
+    success1 = asyncio.run(test_arxiv_scraping(ARXIV_TEST_TITLES))
 
     # Test 2: Task function (will show the logic)
     success2 = test_scrape_sources_task()